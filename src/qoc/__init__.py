@@ -7,7 +7,16 @@ A tool for measuring code contribution based on Abstract Syntax Tree (AST) analy
 __version__ = "1.0.0"
 __author__ = "Ming"
 
-from .analyzer import QOCAnalyzer
 from .models import QOCResult, NodeInfo
 
-__all__ = ['QOCAnalyzer', 'QOCResult', 'NodeInfo'] 
\ No newline at end of file
+__all__ = ['QOCAnalyzer', 'QOCResult', 'NodeInfo']
+
+
+def __getattr__(name):
+    # QOCAnalyzer pulls in tree-sitter, so it is imported on first access
+    # rather than whenever any qoc module (e.g. the CLI for --help) is loaded
+    if name == 'QOCAnalyzer':
+        from .analyzer import QOCAnalyzer
+        globals()['QOCAnalyzer'] = QOCAnalyzer
+        return QOCAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
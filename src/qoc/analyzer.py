@@ -7,19 +7,36 @@ Supports multiple programming languages: Python, JavaScript, Java, C++
 Fully based on Tree-sitter AST parsing
 """
 
+import codecs
+import functools
+import hashlib
+import importlib
+import io
 import json
+import mmap
 import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict, defaultdict
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional, TYPE_CHECKING
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Iterator, List, Tuple, Optional, TYPE_CHECKING
 
+from . import __version__
+from .cache import ResultCache
 from .models import NodeInfo, QOCResult
 
-# Tree-sitter imports
+# Optional faster JSON decoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Tree-sitter imports; grammar packages are imported when first needed
 try:
-    import tree_sitter_python as tspython
-    import tree_sitter_javascript as tsjavascript  
-    import tree_sitter_java as tsjava
-    import tree_sitter_cpp as tscpp
     from tree_sitter import Parser, Language, Node
     TREE_SITTER_AVAILABLE = True
 except ImportError:
@@ -29,148 +46,594 @@ except ImportError:
         from tree_sitter import Node
 
 
+# File extension to language mapping
+_EXT_MAP = MappingProxyType({
+    '.py': 'python',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'javascript',  # TypeScript uses JavaScript parser
+    '.tsx': 'javascript',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.cc': 'cpp',
+    '.cxx': 'cpp',
+    '.c++': 'cpp',
+    '.hpp': 'cpp',
+    '.h': 'cpp',
+    '.hxx': 'cpp'
+})
+
+# Grammar package for each supported language
+_GRAMMAR_MODULES = MappingProxyType({
+    'python': 'tree_sitter_python',
+    'javascript': 'tree_sitter_javascript',
+    'java': 'tree_sitter_java',
+    'cpp': 'tree_sitter_cpp'
+})
+
+def _iter_source_files(directory: str, recursive: bool) -> Iterator[Tuple[str, str]]:
+    """Yield (path, language) for files with a known extension under directory
+    
+    Uses os.scandir, whose entries carry the file type from readdir, so no
+    stat call or Path object is needed per file. Files come in the same
+    depth-first order as Path.glob('**/*'); symlinked directories are not
+    followed and unreadable directories are skipped.
+    """
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                entries = list(entries)
+        except OSError:
+            continue
+        
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    subdirs.append(entry.path)
+                continue
+            
+            # Check the extension before is_file(), which may stat a symlink
+            language = _EXT_MAP.get(os.path.splitext(entry.name)[1].lower())
+            if language and entry.is_file():
+                yield entry.path, language
+        
+        # Visit subdirectories depth-first in listing order
+        stack.extend(reversed(subdirs))
+
+
+# Every ASCII character str.strip() removes; bytes.strip() leaves out \x1c-\x1f
+_ASCII_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+# A carriage return not followed by a newline, i.e. a CR-only line break
+_LONE_CR = re.compile(rb'\r(?!\n)')
+
+@functools.lru_cache(maxsize=8)
+def _load_config(config_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Load and parse a configuration file
+    
+    Cached per process; the modification time is part of the key so an
+    edited file is re-read. The returned dict is shared and must not be mutated.
+    """
+    with open(config_path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def read_config(config_path) -> Dict[str, Any]:
+    """Return the parsed configuration, shared by every caller in the process"""
+    config_path = str(config_path)
+    # Exact integer mtimes avoid float rounding hiding a quick re-edit
+    return _load_config(config_path, os.stat(config_path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def _package_version(name: str) -> str:
+    """Installed version of a distribution, falling back to the module's __version__"""
+    # importlib.metadata pulls in the email package; only cached runs need it
+    import importlib.metadata
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return getattr(sys.modules.get(name), '__version__', '')
+
+
+# Per-process analyzer used by directory worker processes
+_WORKER_ANALYZER = None
+
+
+def _worker_analyze(filepath: str, language: str, config_path: str,
+                    cache_path: Optional[str], refresh_cache: bool = False) -> Optional['QOCResult']:
+    """Analyze one file inside a worker process, reusing the process's analyzer"""
+    global _WORKER_ANALYZER
+    if _WORKER_ANALYZER is None:
+        _WORKER_ANALYZER = QOCAnalyzer(config_path, cache_path, refresh_cache)
+    if not _WORKER_ANALYZER._load_language(language):
+        return None
+    try:
+        return _WORKER_ANALYZER._analyze_file_with_lang(filepath, language)
+    except (OSError, ValueError, RuntimeError):
+        # Skip files that can't be analyzed, as the serial path does
+        return None
+
+
+def _worker_analyze_batch(batch: List[Tuple[int, str, str]], config_path: str,
+                          cache_path: Optional[str],
+                          refresh_cache: bool = False) -> List[Tuple[int, Optional['QOCResult']]]:
+    """Analyze a batch of (index, path, language) entries in a worker process"""
+    return [
+        (index, _worker_analyze(filepath, language, config_path, cache_path, refresh_cache))
+        for index, filepath, language in batch
+    ]
+
+
 class QOCAnalyzer:
     """QOC (Quanta of Code) Analyzer"""
     
-    def __init__(self, config_path: str = None):
+    # Below this many files, process start-up costs more than it saves
+    PARALLEL_MIN_FILES = 8
+    
+    # Once the largest files have been dispatched on their own, the rest is
+    # split into about this many tasks per worker process
+    PARALLEL_TASKS_PER_WORKER = 4
+    
+    # Upper bound on files per task; batches already running when the
+    # consumer stops early still finish
+    PARALLEL_MAX_BATCH = 64
+    
+    # Files larger than this are memory-mapped instead of read into RAM
+    MMAP_MIN_BYTES = 1 << 20
+    
+    # Files larger than this (generated bundles, minified code) are line-counted
+    # only; override with "max_file_bytes" in config.json
+    MAX_FILE_BYTES = 2_000_000
+    
+    # A NUL byte within this prefix marks a file as binary
+    BINARY_SNIFF_BYTES = 8192
+    
+    # Slice size for checking that non-ASCII sources are valid UTF-8
+    UTF8_CHECK_BYTES = 1 << 16
+    
+    # Results kept in memory for files re-analyzed within the same process
+    RECENT_RESULTS_SIZE = 256
+    
+    def __init__(self, config_path: str = None, cache_path: str = None,
+                 refresh_cache: bool = False,
+                 on_language_error: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            config_path: Weight configuration file, defaults to the bundled config.json
+            cache_path: SQLite result cache location; caching is disabled when None
+            refresh_cache: Re-analyze every file instead of reusing cached
+                results; fresh results are still written to the cache
+            on_language_error: Called with (language, error message) when a
+                grammar first fails to load
+        """
         # Get configuration file path
         if config_path is None:
             config_path = Path(__file__).parent.parent.parent / "config.json"
         
+        # Kept so worker processes can build an equivalent analyzer
+        self._config_path = str(config_path)
+        self._cache_path = None if cache_path is None else str(cache_path)
+        self.refresh_cache = refresh_cache
+        self.on_language_error = on_language_error
+        
         # Load configuration
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+        self.config = read_config(self._config_path)
+        
+        self.max_file_bytes = self.config.get('max_file_bytes', self.MAX_FILE_BYTES)
+        
+        # Resolve each language's weight table once instead of per AST node.
+        # Keys are interned like the kind names below, so lookups match by identity
+        self._weights_by_lang: Dict[str, Dict[str, float]] = {
+            lang: {sys.intern(node_type): weight
+                   for node_type, weight in lang_config.get('node_weights', {}).items()}
+            for lang, lang_config in self.config['languages'].items()
+        }
         
-        # Initialize language parsers
+        # Per-language cache key component, computed on first cache use
+        self._cfg_hashes: Dict[str, str] = {}
+        
+        # Open the persistent result cache; analysis still works without it
+        self.cache = None
+        if cache_path is not None:
+            try:
+                self.cache = ResultCache(cache_path)
+            except (OSError, sqlite3.Error):
+                self.cache = None
+        
+        # Languages are set up on first use (see _load_language); parsers are
+        # kept per thread since a tree-sitter Parser must not run concurrent
+        # parse() calls
         self.languages = {}
-        self.parsers = {}
+        self._kind_names: Dict[str, List[str]] = {}
+        self._skip_kinds: Dict[str, frozenset] = {}
+        self.failed_languages: List[Tuple[str, str]] = []
+        
+        # In-process LRU of results keyed by (path, mtime_ns, size), so
+        # repeated analyses of an unchanged file skip reading and parsing
+        self._recent_results: OrderedDict = OrderedDict()
+        self._recent_results_lock = threading.Lock()
+        
+        # Trees kept by update_file() for incremental re-analysis, keyed by path
+        self._trees: Dict[str, Any] = {}
+        self._local = threading.local()
         
-        # Initialize supported languages
-        self._init_languages()
-    
-    def _init_languages(self):
-        """Initialize Tree-sitter language parsers"""
         if not TREE_SITTER_AVAILABLE:
             raise ImportError("Tree-sitter not available. Install tree-sitter packages.")
-            
-        language_configs = {
-            'python': tspython,
-            'javascript': tsjavascript,
-            'java': tsjava,
-            'cpp': tscpp
-        }
+    
+    def _load_language(self, lang_name: str) -> bool:
+        """Set up a language's grammar and node tables on first use
         
-        failed_languages = []
-        for lang_name, lang_module in language_configs.items():
-            try:
-                # Create language object
-                language = Language(lang_module.language())
-                self.languages[lang_name] = language
-                
-                # Create parser
-                parser = Parser(language=language)
-                self.parsers[lang_name] = parser
-                
-            except Exception as e:
-                failed_languages.append((lang_name, str(e)))
+        Returns whether the language is usable; failures are recorded once,
+        passed to on_language_error and reported by get_failed_languages().
+        """
+        if lang_name in self.languages:
+            return True
+        if lang_name not in _GRAMMAR_MODULES or any(
+            name == lang_name for name, _ in self.failed_languages
+        ):
+            return False
         
-        # If some languages failed to initialize, we can still continue with the others
-        # but raise a warning through the caller
-        if failed_languages:
-            self.failed_languages = failed_languages
-        else:
-            self.failed_languages = []
+        try:
+            # Create language object
+            lang_module = importlib.import_module(_GRAMMAR_MODULES[lang_name])
+            language = Language(lang_module.language())
+            
+            # Create parser
+            parser = Parser(language=language)
+            
+            # Node type names indexed by kind id, for mapping traversal counts back
+            kind_names = [sys.intern(language.node_kind_for_id(kind_id) or '')
+                          for kind_id in range(language.node_kind_count)]
+            
+            # Kinds whose subtrees are counted as a single node (config
+            # "skip_node_types"), e.g. string literals or comments
+            skip_types = set(
+                self.config['languages'].get(lang_name, {}).get('skip_node_types', ())
+            )
+            skip_kinds = frozenset(
+                kind_id for kind_id, name in enumerate(kind_names) if name in skip_types
+            )
+            
+        except Exception as e:
+            # A failed language doesn't stop the others from being used
+            self.failed_languages.append((lang_name, str(e)))
+            if self.on_language_error is not None:
+                self.on_language_error(lang_name, str(e))
+            return False
+        
+        self.parsers[lang_name] = parser
+        self._kind_names[lang_name] = kind_names
+        self._skip_kinds[lang_name] = skip_kinds
+        # Published last: other threads treat membership as "ready"
+        self.languages[lang_name] = language
+        return True
+    
+    @property
+    def parsers(self) -> Dict[str, Any]:
+        """Parsers owned by the calling thread, keyed by language name"""
+        parsers = getattr(self._local, 'parsers', None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+        return parsers
+    
+    def _get_parser(self, language: str):
+        """Return the calling thread's parser for a language, creating it on first use"""
+        parsers = self.parsers
+        parser = parsers.get(language)
+        if parser is None:
+            parser = parsers[language] = Parser(language=self.languages[language])
+        return parser
     
     def get_failed_languages(self) -> List[Tuple[str, str]]:
-        """获取初始化失败的语言列表"""
-        return getattr(self, 'failed_languages', [])
+        """获取初始化失败的语言列表
+        
+        Sets up every supported language that hasn't been used yet, so the
+        list is complete.
+        """
+        for lang_name in _GRAMMAR_MODULES:
+            self._load_language(lang_name)
+        return list(self.failed_languages)
     
     def _get_language_from_extension(self, filepath: str) -> Optional[str]:
         """Determine programming language from file extension"""
-        ext = Path(filepath).suffix.lower()
-        
-        extension_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.jsx': 'javascript',
-            '.ts': 'javascript',  # TypeScript uses JavaScript parser
-            '.tsx': 'javascript',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.cc': 'cpp',
-            '.cxx': 'cpp',
-            '.c++': 'cpp',
-            '.hpp': 'cpp',
-            '.h': 'cpp',
-            '.hxx': 'cpp'
-        }
-        
-        return extension_map.get(ext)
+        # os.path.splitext is a plain string operation; no Path object per file
+        return _EXT_MAP.get(os.path.splitext(filepath)[1].lower())
     
-    def _get_file_lines(self, filepath: str) -> tuple[int, int]:
-        """Calculate file lines - returns (loc, sloc)
+    def _count_lines(self, source) -> Tuple[int, int]:
+        """Calculate file lines from already-read source bytes - returns (loc, sloc)
         
         Returns:
             tuple: (LOC - lines including empty lines and comments, SLOC - source lines excluding empty lines)
         """
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                loc = len(lines)  # Lines of Code (including empty lines and comments)
-                # Only count non-empty lines for SLOC
-                non_empty_lines = [line for line in lines if line.strip()]
-                sloc = len(non_empty_lines)  # Source Lines of Code
-                return loc, sloc
-        except Exception as e:
-            raise IOError(f"Cannot read file lines from {filepath}: {e}")
+        # Stream line by line instead of materializing a list of lines
+        if source.find(b'\r') != -1 and _LONE_CR.search(source):
+            # CR-only line breaks (never normalized for oversized files);
+            # splitlines() breaks at \r, \n and \r\n like a text-mode read
+            lines = source[:].splitlines(keepends=True)
+        elif isinstance(source, mmap.mmap):
+            source.seek(0)
+            lines = iter(source.readline, b'')
+        else:
+            lines = io.BytesIO(source)
+        
+        loc = sloc = 0
+        for line in lines:
+            # Lines of Code (including empty lines and comments)
+            loc += 1
+            # Only count non-empty lines for SLOC; stripping also drops the '\r'
+            # of CRLF. A line left with non-ASCII bytes may still be blank
+            # text (e.g. U+00A0 or U+3000), so decide on the decoded line
+            stripped = line.strip(_ASCII_WHITESPACE)
+            if stripped and (stripped.isascii() or stripped.decode('utf-8', 'ignore').strip()):
+                sloc += 1
+        return loc, sloc
     
-    def _traverse_ast(self, node, language: str, node_stats: Dict[str, NodeInfo]) -> None:
-        """Recursively traverse AST nodes and calculate weights"""
-        node_type = node.type
+    def _traverse_ast(self, cursor, weights: Dict[str, float], kind_names: List[str],
+                      skip_kinds: frozenset, node_stats: Dict[str, NodeInfo]) -> Tuple[float, int]:
+        """Traverse AST nodes in pre-order and calculate weights
         
-        # Get weight configuration for this language
-        weights = self.config['languages'].get(language, {}).get('node_weights', {})
-        weight = weights.get(node_type, 1.0)  # Default weight is 1.0
+        Returns:
+            tuple: (total QOC, number of weighted AST nodes) over node_stats
         
-        if weight > 0:  # Only record nodes with weight
-            if node_type in node_stats:
-                node_stats[node_type].count += 1
-                node_stats[node_type].total_weight += weight
-            else:
-                node_stats[node_type] = NodeInfo(
+        Walks the tree with a TreeCursor, which moves through the tree natively
+        instead of materializing a Python list of children for every node.
+        The hot loop only bumps a flat list of counters indexed by integer kind
+        id; ids are mapped back to node type names and NodeInfo objects once
+        per distinct kind after the walk, in first-visit order so node_stats
+        lists node types as they first appear. Callers only pass error-free trees,
+        whose kind ids all fall inside the language's kind table. Nodes whose
+        kind is in skip_kinds are counted but their subtrees are not visited.
+        """
+        counts = [0] * len(kind_names)
+        # Kind ids in the order they were first visited
+        seen = []
+        goto_first_child = cursor.goto_first_child
+        goto_next_sibling = cursor.goto_next_sibling
+        goto_parent = cursor.goto_parent
+        
+        visited_children = False
+        while True:
+            if not visited_children:
+                kind_id = cursor.node.kind_id
+                count = counts[kind_id]
+                if not count:
+                    seen.append(kind_id)
+                counts[kind_id] = count + 1
+                
+                if (not skip_kinds or kind_id not in skip_kinds) and goto_first_child():
+                    continue
+                visited_children = True
+            
+            if goto_next_sibling():
+                visited_children = False
+            elif not goto_parent():
+                break
+        
+        # Several kind ids can share a name (e.g. named and anonymous nodes)
+        type_counts = defaultdict(int)
+        for kind_id in seen:
+            type_counts[kind_names[kind_id]] += counts[kind_id]
+        
+        get_weight = weights.get
+        total_qoc = 0
+        total_ast_nodes = 0
+        for node_type, count in type_counts.items():
+            weight = get_weight(node_type, 1.0)  # Default weight is 1.0
+            if weight > 0:  # Only record nodes with weight
+                node_info = node_stats[node_type] = NodeInfo(
                     node_type=node_type,
                     weight=weight,
-                    count=1
+                    count=count
                 )
+                total_qoc += node_info.total_weight
+                total_ast_nodes += count
         
-        # Recursively process child nodes
-        for child in node.children:
-            self._traverse_ast(child, language, node_stats)
+        return total_qoc, total_ast_nodes
     
     def analyze_file(self, filepath: str) -> QOCResult:
         """Analyze QOC (Quanta of Code) of a single file"""
-        if not os.path.exists(filepath):
+        # Determine programming language
+        language = self._get_language_from_extension(filepath)
+        if not language:
+            raise ValueError(f"Unsupported file type: {filepath}")
+        
+        if not self._load_language(language):
+            raise RuntimeError(f"{language} parser not initialized")
+        
+        return self._analyze_file_with_lang(filepath, language)
+    
+    def _analyze_file_with_lang(self, filepath: str, language: str) -> QOCResult:
+        """Analyze a file whose language the caller has already resolved"""
+        # No separate existence check: the stat below reports a missing file
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File does not exist: {filepath}")
+        except OSError as e:
+            raise IOError(f"Cannot read file {filepath}: {e}")
         
-        # Determine programming language
+        key = (filepath, stat.st_mtime_ns, stat.st_size)
+        if not self.refresh_cache:
+            with self._recent_results_lock:
+                result = self._recent_results.get(key)
+                if result is not None:
+                    self._recent_results.move_to_end(key)
+                    return result
+        
+        source = self._read_source(filepath)
+        try:
+            result = self._screen_source(filepath, language, source)
+            if result is None:
+                source = self._normalize_source(source)
+                result = self._analyze_cached(filepath, language, source)
+        finally:
+            if isinstance(source, mmap.mmap):
+                source.close()
+        
+        with self._recent_results_lock:
+            self._recent_results[key] = result
+            if len(self._recent_results) > self.RECENT_RESULTS_SIZE:
+                self._recent_results.popitem(last=False)
+        return result
+    
+    def update_file(self, filepath: str, edits: List[Tuple] = ()) -> QOCResult:
+        """Re-analyze a file after it was edited, reparsing incrementally
+        
+        The tree from this path's previous update_file() call is kept in
+        memory, and edits describes the changes made to the file since then so
+        tree-sitter can reuse every unchanged subtree. Each edit is a tuple of
+        (start_byte, old_end_byte, new_end_byte, start_point, old_end_point,
+        new_end_point), with points given as (row, column). The first call for
+        a path, or a call without edits, parses the whole file, as does any
+        call for a file that isn't UTF-8 or uses CR-only line breaks.
+        """
         language = self._get_language_from_extension(filepath)
         if not language:
             raise ValueError(f"Unsupported file type: {filepath}")
         
-        if language not in self.parsers:
+        if not self._load_language(language):
             raise RuntimeError(f"{language} parser not initialized")
         
-        # Read file content
+        old_tree = self._trees.pop(filepath, None) if edits else None
+        if old_tree is not None:
+            for start_byte, old_end_byte, new_end_byte, start_point, old_end_point, new_end_point in edits:
+                old_tree.edit(
+                    start_byte=start_byte,
+                    old_end_byte=old_end_byte,
+                    new_end_byte=new_end_byte,
+                    start_point=start_point,
+                    old_end_point=old_end_point,
+                    new_end_point=new_end_point
+                )
+        
+        raw = self._read_source(filepath)
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                source_code = f.read()
-        except Exception as e:
+            result = self._screen_source(filepath, language, raw)
+            if result is not None:
+                return result
+            
+            source = self._normalize_source(raw)
+            if source is not raw:
+                # Edits are byte offsets into the file on disk, which no longer
+                # line up with the rewritten buffer: parse it from scratch and
+                # keep no tree
+                return self._analyze_source(filepath, language, source)
+            
+            if isinstance(source, mmap.mmap):
+                # A kept tree reads its text from the parsed buffer, which has
+                # to outlive the mapping
+                source = source[:]
+            return self._analyze_source(filepath, language, source, old_tree, keep_tree=True)
+        finally:
+            if isinstance(raw, mmap.mmap):
+                raw.close()
+    
+    def forget_file(self, filepath: str) -> None:
+        """Drop the tree kept for incremental updates of a file"""
+        self._trees.pop(filepath, None)
+    
+    def _screen_source(self, filepath: str, language: str, source) -> Optional[QOCResult]:
+        """Reject binary files and line-count oversized ones without parsing
+        
+        Returns None when the source should go through full AST analysis.
+        """
+        if source.find(b'\x00', 0, self.BINARY_SNIFF_BYTES) != -1:
+            raise ValueError(f"Binary file: {filepath}")
+        
+        if len(source) > self.max_file_bytes:
+            # Too large to be hand-written code; skip the parser
+            loc, sloc = self._count_lines(source)
+            return self._line_estimate_result(filepath, language, loc, sloc)
+        
+        return None
+    
+    def _read_source(self, filepath: str):
+        """Load file content as bytes, or as a read-only mmap for large files
+        
+        tree-sitter parses bytes directly and accepts any buffer, so a mapping
+        lets the OS page in large files on demand instead of copying them.
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                if os.fstat(f.fileno()).st_size > self.MMAP_MIN_BYTES:
+                    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                return f.read()
+        except OSError as e:
             raise IOError(f"Cannot read file {filepath}: {e}")
+    
+    def _normalize_source(self, source):
+        """Return source as a UTF-8 text-mode read would see it
+        
+        Matches open(..., errors='ignore') with universal newlines: bytes that
+        aren't valid UTF-8 are dropped and CR-only line breaks become LF.
+        Valid UTF-8 without lone CRs, the common case, is returned unchanged;
+        its CRLF line breaks parse and count the same as LF. A replaced mmap
+        is closed.
+        """
+        if self._is_utf8(source) and (source.find(b'\r') == -1 or not _LONE_CR.search(source)):
+            return source
+        
+        text = str(source, 'utf-8', 'ignore')
+        if isinstance(source, mmap.mmap):
+            source.close()
+        return text.replace('\r\n', '\n').replace('\r', '\n').encode('utf-8')
+    
+    def _is_utf8(self, source) -> bool:
+        """Check that source is valid UTF-8 without decoding it all at once"""
+        if isinstance(source, bytes) and source.isascii():
+            return True
+        
+        # Decode bounded slices, so an mmap is never copied whole into memory
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            for start in range(0, len(source), self.UTF8_CHECK_BYTES):
+                decoder.decode(source[start:start + self.UTF8_CHECK_BYTES])
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+        return True
+    
+    def _analyze_cached(self, filepath: str, language: str, source) -> QOCResult:
+        """Analyze loaded source, going through the result cache when enabled"""
+        if self.cache is None:
+            return self._analyze_source(filepath, language, source)
+        
+        # Unchanged content under the same weights reuses the stored result
+        digest = hashlib.sha256(source).hexdigest()
+        cfg_hash = self._cfg_hashes.get(language)
+        if cfg_hash is None:
+            cfg_hash = self._cfg_hashes[language] = self._config_hash(language)
+        return self.cache.get_or_compute(
+            filepath, digest, cfg_hash,
+            lambda: self._analyze_source(filepath, language, source),
+            refresh=self.refresh_cache
+        )
+    
+    def _config_hash(self, language: str) -> str:
+        """Hash a language's settings together with the qoc, tree-sitter and
+        grammar versions, so weight edits and upgrades invalidate cached results"""
+        return hashlib.sha256(json.dumps([
+            self.config['languages'].get(language, {}),
+            __version__,
+            _package_version('tree_sitter'),
+            _package_version(_GRAMMAR_MODULES[language]),
+        ], sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def _analyze_source(self, filepath: str, language: str, source,
+                        old_tree=None, keep_tree: bool = False) -> QOCResult:
+        """Parse and measure already-loaded source code
         
+        old_tree, already edited to match source, enables incremental parsing;
+        keep_tree stores the new tree for the next update_file() call.
+        """
         # Get lines of code
-        loc, sloc = self._get_file_lines(filepath)
+        loc, sloc = self._count_lines(source)
         
-        if not source_code.strip():
+        if not sloc:
             # Handle empty files
             return QOCResult(
                 filepath=filepath,
@@ -182,70 +645,167 @@ class QOCAnalyzer:
                 node_stats={}
             )
         
+        # Parse source code with this thread's reusable parser, cleared of
+        # any state left over from the previous file; only parser failures
+        # are reported as analysis errors, anything else is a bug
         try:
-            # Parse source code
-            tree = self.parsers[language].parse(bytes(source_code, 'utf8'))
-            
-            if tree.root_node.has_error:
-                # Handle syntax errors, return simple estimation based on line count
-                return QOCResult(
-                    filepath=filepath,
-                    language=language,
-                    total_qoc=sloc,
-                    ast_nodes=0,
-                    sloc=sloc,  # Source Lines of Code  
-                    loc=loc,  # Lines of Code
-                    node_stats={}
-                )
-            
-            # Traverse AST and collect node information
-            node_stats = {}
-            self._traverse_ast(tree.root_node, language, node_stats)
-            
-            # Calculate total QOC
-            total_qoc = sum(node_info.total_weight for node_info in node_stats.values())
-            total_ast_nodes = sum(node_info.count for node_info in node_stats.values())
-            
-            return QOCResult(
-                filepath=filepath,
-                language=language,
-                total_qoc=total_qoc,
-                ast_nodes=total_ast_nodes,
-                sloc=sloc,  # Source Lines of Code
-                loc=loc,  # Lines of Code
-                node_stats=node_stats
-            )
-            
-        except Exception as e:
+            parser = self._get_parser(language)
+            parser.reset()
+            if old_tree is not None:
+                tree = parser.parse(source, old_tree)
+            else:
+                tree = parser.parse(source)
+        except ValueError as e:
             raise RuntimeError(f"Error analyzing file {filepath}: {e}")
+        if tree is None:
+            raise RuntimeError(f"Error analyzing file {filepath}: parsing failed")
+        if keep_tree:
+            self._trees[filepath] = tree
+        
+        if tree.root_node.has_error:
+            # Handle syntax errors, return simple estimation based on line count
+            return self._line_estimate_result(filepath, language, loc, sloc)
+        
+        # Traverse AST and collect node information
+        node_stats = {}
+        weights = self._weights_by_lang.get(language, {})
+        total_qoc, total_ast_nodes = self._traverse_ast(
+            tree.walk(), weights, self._kind_names[language],
+            self._skip_kinds[language], node_stats
+        )
+        
+        return QOCResult(
+            filepath=filepath,
+            language=language,
+            total_qoc=total_qoc,
+            ast_nodes=total_ast_nodes,
+            sloc=sloc,  # Source Lines of Code
+            loc=loc,  # Lines of Code
+            node_stats=node_stats
+        )
+    
+    def _line_estimate_result(self, filepath: str, language: str, loc: int, sloc: int) -> QOCResult:
+        """Build a result without AST analysis, estimating QOC from the line count"""
+        return QOCResult(
+            filepath=filepath,
+            language=language,
+            total_qoc=sloc,
+            ast_nodes=0,
+            sloc=sloc,  # Source Lines of Code
+            loc=loc,  # Lines of Code
+            node_stats={}
+        )
     
-    def analyze_directory(self, directory: str, recursive: bool = False) -> List[QOCResult]:
-        """Analyze all supported files in directory"""
-        results = []
+    def analyze_directory(self, directory: str, recursive: bool = False,
+                          jobs: Optional[int] = None) -> List[QOCResult]:
+        """Analyze all supported files in directory
         
+        Files are analyzed in parallel worker processes when there are enough
+        of them to amortize process start-up; results keep directory order.
+        
+        Args:
+            jobs: Number of worker processes, defaults to the CPU count; 1 analyzes serially
+        """
+        return list(self.analyze_directory_iter(directory, recursive, jobs))
+    
+    def analyze_directory_iter(self, directory: str, recursive: bool = False,
+                               jobs: Optional[int] = None) -> Iterator[QOCResult]:
+        """Yield analysis results for all supported files in directory
+        
+        Same as analyze_directory, but results are yielded in directory order
+        as they become available, so callers can process them without
+        holding every result in memory.
+        """
         directory_path = Path(directory)
         if not directory_path.exists():
             raise FileNotFoundError(f"Directory does not exist: {directory}")
         
-        # Get all files
-        if recursive:
-            pattern = "**/*"
-        else:
-            pattern = "*"
-        
-        for file_path in directory_path.glob(pattern):
-            if file_path.is_file():
-                # Check if file is supported
-                language = self._get_language_from_extension(str(file_path))
-                if language and language in self.parsers:
-                    try:
-                        result = self.analyze_file(str(file_path))
-                        results.append(result)
-                    except (ValueError, RuntimeError):
-                        # Skip unsupported files silently
-                        continue
-                    except Exception:
-                        # Skip files that can't be analyzed
-                        continue
-        
-        return results 
\ No newline at end of file
+        # The walker already knows each file's language; pass it along
+        # rather than resolving it again per file
+        sources = [
+            (filepath, language) for filepath, language in _iter_source_files(directory, recursive)
+            if self._load_language(language)
+        ]
+        
+        max_workers = jobs or os.cpu_count() or 1
+        if max_workers > 1 and len(sources) >= self.PARALLEL_MIN_FILES:
+            results = self._iter_files_parallel(sources, max_workers)
+            try:
+                # Starts the pool; failures here happen before anything is yielded
+                first = next(results)
+            except StopIteration:
+                return
+            except (OSError, NotImplementedError):
+                # Process pools are unavailable on some platforms; fall back to serial
+                pass
+            else:
+                yield first
+                yield from results
+                return
+        
+        for filepath, language in sources:
+            try:
+                result = self._analyze_file_with_lang(filepath, language)
+            except (OSError, ValueError, RuntimeError):
+                # Skip unreadable, binary or unparsable files; anything else is a bug
+                continue
+            yield result
+    
+    def _iter_files_parallel(self, sources: List[Tuple[str, str]],
+                             max_workers: int) -> Iterator[QOCResult]:
+        """Analyze (path, language) pairs across a process pool, one analyzer per worker process
+        
+        Files are dispatched largest first, so a few big files start early
+        instead of holding up the pool at the end. The largest get a task of
+        their own; the smaller tail is batched, scaled to the number of files,
+        to amortize inter-process round trips. Results are yielded in the original order, each as soon
+        as every file before it is done.
+        """
+        sized = []
+        for index, (filepath, language) in enumerate(sources):
+            try:
+                size = os.stat(filepath).st_size
+            except OSError:
+                size = 0
+            sized.append((size, index, filepath, language))
+        sized.sort(key=lambda item: (-item[0], item[1]))
+        
+        ordered = [(index, filepath, language) for _, index, filepath, language in sized]
+        batches = [[entry] for entry in ordered[:max_workers]]
+        tail = ordered[max_workers:]
+        # Few large batches keep round trips down on big trees; a handful
+        # per worker still lets the pool even out uneven file sizes
+        chunksize = max(1, len(tail) // (self.PARALLEL_TASKS_PER_WORKER * max_workers))
+        # Capped, so stopping early only waits for a few small batches
+        chunksize = min(chunksize, self.PARALLEL_MAX_BATCH)
+        batches.extend(
+            tail[start:start + chunksize]
+            for start in range(0, len(tail), chunksize)
+        )
+        
+        # Imported here so single-file use doesn't pay for multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        
+        # Finished results waiting for an earlier file, by source index
+        finished: Dict[int, Optional[QOCResult]] = {}
+        next_index = 0
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [
+                executor.submit(_worker_analyze_batch, batch, self._config_path,
+                                self._cache_path, self.refresh_cache)
+                for batch in batches
+            ]
+            for future in as_completed(futures):
+                for index, result in future.result():
+                    finished[index] = result
+                
+                while next_index in finished:
+                    result = finished.pop(next_index)
+                    next_index += 1
+                    if result is not None:
+                        yield result
+        finally:
+            # If the consumer stops early, drop the batches not yet started
+            # instead of waiting for the rest of the tree
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+QOC Result Cache
+Persistent content-addressed cache for QOC analysis results
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from .models import QOCResult
+
+
+def default_cache_path() -> Path:
+    """Return the default cache database location (~/.cache/qoc/cache.sqlite)"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'qoc' / 'cache.sqlite'
+
+
+class ResultCache:
+    """SQLite-backed cache of QOCResult objects
+    
+    Entries are keyed by (path, content hash, config hash), so editing either
+    the file or its language's weight table simply misses the old entry.
+    Only the latest entry per path is kept. One instance can be shared by
+    threads; access to the connection is serialized.
+    """
+    
+    # Bump whenever the pickled QOCResult layout changes
+    SCHEMA_VERSION = 4
+    
+    def __init__(self, path: Union[str, Path, None] = None):
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        # WAL lets concurrent qoc processes read while another one writes;
+        # with WAL, NORMAL sync only risks losing the latest entries on power loss
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self._conn.execute('DROP TABLE IF EXISTS results')
+            self._conn.execute(f'PRAGMA user_version={self.SCHEMA_VERSION}')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'path TEXT, hash TEXT, cfg_hash TEXT, result BLOB, '
+            'PRIMARY KEY(path, hash, cfg_hash))'
+        )
+        self._conn.commit()
+    
+    def get(self, filepath: str, digest: str, cfg_hash: str) -> Optional[QOCResult]:
+        """Return the cached result, or None on a miss"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT result FROM results WHERE path=? AND hash=? AND cfg_hash=?',
+                    (filepath, digest, cfg_hash)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        
+        if row is None:
+            return None
+        
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            # Unreadable entries behave like misses and get overwritten
+            return None
+    
+    def put(self, filepath: str, digest: str, cfg_hash: str, result: QOCResult) -> None:
+        """Store a result, replacing older entries for the path; cache write
+        failures never break analysis"""
+        data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        try:
+            with self._lock, self._conn:
+                self._conn.execute('DELETE FROM results WHERE path=?', (filepath,))
+                self._conn.execute(
+                    'INSERT INTO results VALUES (?, ?, ?, ?)',
+                    (filepath, digest, cfg_hash, data)
+                )
+        except sqlite3.Error:
+            pass
+    
+    def get_or_compute(self, filepath: str, digest: str, cfg_hash: str,
+                       compute: Callable[[], QOCResult], refresh: bool = False) -> QOCResult:
+        """Return the cached result, or compute, store and return it on a miss
+        
+        With refresh, the stored entry is ignored and replaced.
+        """
+        result = None if refresh else self.get(filepath, digest, cfg_hash)
+        if result is None:
+            result = compute()
+            self.put(filepath, digest, cfg_hash, result)
+        return result
+    
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
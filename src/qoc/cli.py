@@ -6,18 +6,171 @@ Usage: python -m qoc <command> [options]
 """
 
 import os
-import json
-import csv
+import io
+import re
+import stat
 import sys
 import argparse
+import atexit
+import contextlib
+import heapq
+import shutil
+import tempfile
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any, Iterable, Iterator, TYPE_CHECKING
 
-from .analyzer import QOCAnalyzer
 from .models import QOCResult
 
+# The analyzer (and with it tree-sitter) is imported when a command first
+# needs it, so --help and --version start without loading any grammar
+if TYPE_CHECKING:
+    from .analyzer import QOCAnalyzer
 
-def print_result(result: QOCResult, detailed: bool = False):
+# Write buffer for CSV reports
+CSV_BUFFER_SIZE = 1024 * 1024
+
+# Characters that make csv.writer quote a field
+_CSV_SPECIAL_CHARS = re.compile(r'[,"\r\n]')
+
+# Encoded JSON file records are kept in memory up to this size, then on disk
+JSON_SPOOL_SIZE = 8 * 1024 * 1024
+
+# Optional faster JSON encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dump_json(data: Dict[str, Any]) -> bytes:
+    """Serialize data as indented UTF-8 JSON, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    import json
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+@contextlib.contextmanager
+def buffered_output():
+    """Collect everything printed inside the block and write it to stdout at once
+    
+    Console reports are made of many short print() calls; buffering them
+    replaces a stdout write (and, on a terminal, a flush) per line with a
+    single write. Buffered text is still emitted if the block raises.
+    """
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            yield buffer
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+
+
+def json_file_record(result: QOCResult, detailed: bool = False) -> Dict[str, Any]:
+    """Build the JSON report entry for one file"""
+    file_data = {
+        'filepath': result.filepath,
+        'language': result.language,
+        'qoc': result.total_qoc,
+        'loc': result.loc,  # Lines of Code
+        'sloc': result.sloc,  # Source Lines of Code
+        'ast_nodes': result.ast_nodes
+    }
+    
+    if detailed and result.node_stats:
+        file_data['node_stats'] = {}
+        for node_type, node_info in result.node_stats.items():
+            file_data['node_stats'][node_type] = {
+                'count': node_info.count,
+                'weight': node_info.weight,
+                'total_weight': node_info.total_weight
+            }
+    
+    return file_data
+
+
+def write_json_report(out, results: Iterable[QOCResult], detailed: bool = False):
+    """Write {"summary": ..., "files": [...]} to a binary stream, one file record at a time
+    
+    Produces the same indented layout as dumping the whole report at once,
+    without holding every result, record or the encoded document in memory.
+    The summary comes first but depends on every file, so the encoded
+    records are spooled (to disk once large) while the totals are gathered.
+    """
+    total_files = 0
+    total_qoc = 0
+    total_loc = 0
+    total_sloc = 0
+    total_nodes = 0
+    
+    with tempfile.SpooledTemporaryFile(max_size=JSON_SPOOL_SIZE) as spool:
+        separator = b'\n    '
+        for result in results:
+            total_files += 1
+            total_qoc += result.total_qoc
+            total_loc += result.loc
+            total_sloc += result.sloc
+            total_nodes += result.ast_nodes
+            
+            spool.write(separator + dump_json(json_file_record(result, detailed)).replace(b'\n', b'\n    '))
+            separator = b',\n    '
+        
+        summary = {
+            'total_files': total_files,
+            'total_qoc': total_qoc,
+            'total_loc': total_loc,  # Lines of Code (including empty lines)
+            'total_sloc': total_sloc,  # Source Lines of Code (excluding empty lines)
+            'total_nodes': total_nodes
+        }
+        out.write(b'{\n  "summary": ' + dump_json(summary).replace(b'\n', b'\n  ') + b',\n  "files": [')
+        
+        spool.seek(0)
+        shutil.copyfileobj(spool, out)
+    
+    # An empty list stays on one line, as json.dumps would write it
+    out.write(b']\n}' if total_files == 0 else b'\n  ]\n}')
+
+
+def csv_report_lines(results: Iterable[QOCResult]) -> Iterator[str]:
+    """Yield the CSV report line by line, header first
+    
+    Rows are %-formatted directly; only a path containing a delimiter, quote
+    or newline goes through the csv module to be quoted, so the output is
+    the same as writing every row with csv.writer.
+    """
+    import csv
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def quoted(row) -> str:
+        writer.writerow(row)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+    
+    yield quoted(['Filename', 'Language', 'QOC', 'AST Nodes', 'LOC', 'SLOC', 'QOC/SLOC Ratio'])
+    
+    needs_quoting = _CSV_SPECIAL_CHARS.search
+    for result in results:
+        ratio = result.total_qoc / result.sloc if result.sloc > 0 else 0
+        if needs_quoting(result.filepath):
+            yield quoted([
+                result.filepath, result.language, f"{result.total_qoc:.1f}",
+                result.ast_nodes, result.loc, result.sloc, f"{ratio:.2f}"
+            ])
+        else:
+            yield "%s,%s,%.1f,%d,%d,%d,%.2f\r\n" % (
+                result.filepath, result.language, result.total_qoc,
+                result.ast_nodes, result.loc, result.sloc, ratio
+            )
+
+
+def print_result(result: QOCResult, detailed: bool = False, top: int = 0):
     """打印分析结果"""
     print(f"\n📄 File: {result.filepath}")
     print(f"🔤 Language: {result.language}")
@@ -36,37 +189,58 @@ def print_result(result: QOCResult, detailed: bool = False):
         print(f"{'Node Type':<30} {'Count':<8} {'Weight':<8} {'Total Weight':<12} {'Percentage':<10}")
         print("=" * 80)
         
-        # Sort nodes by total weight (descending)
-        sorted_nodes = sorted(result.node_stats.items(), 
-                            key=lambda x: x[1].total_weight, reverse=True)
-        
-        for node_type, node_info in sorted_nodes:
-            percentage = (node_info.total_weight / result.total_qoc * 100) if result.total_qoc > 0 else 0
-            print(f"{node_type:<30} {node_info.count:<8} {node_info.weight:<8.1f} {node_info.total_weight:<12.1f} {percentage:<10.1f}%")
+        # Sort nodes by total weight (descending); with a row limit only
+        # the top entries are selected instead of sorting every node type
+        if top > 0:
+            sorted_nodes = heapq.nlargest(top, result.node_stats.items(),
+                                          key=lambda x: x[1].total_weight)
+        else:
+            sorted_nodes = sorted(result.node_stats.items(), 
+                                key=lambda x: x[1].total_weight, reverse=True)
+        
+        # %-formatting a fixed row layout is cheaper than an f-string per row
+        inv_total = 100.0 / result.total_qoc if result.total_qoc > 0 else 0.0
+        print("\n".join([
+            "%-30s %-8d %-8.1f %-12.1f %-10.1f%%" % (
+                node_type, node_info.count, node_info.weight,
+                node_info.total_weight, node_info.total_weight * inv_total
+            )
+            for node_type, node_info in sorted_nodes
+        ]))
+        
+        omitted = len(result.node_stats) - len(sorted_nodes)
+        if omitted > 0:
+            print(f"... ({omitted} more rows omitted)")
 
 
-def print_summary(results: List[QOCResult]):
+def print_summary(results: Iterable[QOCResult]):
     """打印分析摘要"""
-    if not results:
-        print("⚠️  No analysis results to display")
-        return
+    total_files = 0
+    total_qoc = 0
+    total_sloc = 0  # Source Lines of Code
+    total_loc = 0  # Lines of Code
+    total_ast_nodes = 0
     
-    total_files = len(results)
-    total_qoc = sum(r.total_qoc for r in results)
-    total_sloc = sum(r.sloc for r in results)  # Source Lines of Code
-    total_loc = sum(r.loc for r in results)  # Lines of Code
-    total_ast_nodes = sum(r.ast_nodes for r in results)
-    
-    # Language statistics
+    # Language statistics: [count, qoc, sloc, loc], gathered in the same pass
     language_stats = {}
     for result in results:
-        lang = result.language
-        if lang not in language_stats:
-            language_stats[lang] = {'count': 0, 'qoc': 0, 'sloc': 0, 'loc': 0}
-        language_stats[lang]['count'] += 1
-        language_stats[lang]['qoc'] += result.total_qoc
-        language_stats[lang]['sloc'] += result.sloc
-        language_stats[lang]['loc'] += result.loc
+        total_files += 1
+        total_qoc += result.total_qoc
+        total_sloc += result.sloc
+        total_loc += result.loc
+        total_ast_nodes += result.ast_nodes
+        
+        stats = language_stats.get(result.language)
+        if stats is None:
+            stats = language_stats[result.language] = [0, 0, 0, 0]
+        stats[0] += 1
+        stats[1] += result.total_qoc
+        stats[2] += result.sloc
+        stats[3] += result.loc
+    
+    if not total_files:
+        print("⚠️  No analysis results to display")
+        return
     
     # Display summary
     print("=" * 80)
@@ -87,9 +261,9 @@ def print_summary(results: List[QOCResult]):
         print(f"{'Language':<12} {'Files':<8} {'QOC':<12} {'LOC':<8} {'SLOC':<8} {'Percentage':<10}")
         print("=" * 80)
         
-        for lang, stats in sorted(language_stats.items(), key=lambda x: x[1]['count'], reverse=True):
-            percentage = (stats['count'] / total_files) * 100
-            print(f"{lang.capitalize():<12} {stats['count']:<8} {stats['qoc']:<12.1f} {stats['loc']:<8} {stats['sloc']:<8} {percentage:<10.1f}%")
+        for lang, (count, qoc, sloc, loc) in sorted(language_stats.items(), key=lambda x: x[1][0], reverse=True):
+            percentage = (count / total_files) * 100
+            print(f"{lang.capitalize():<12} {count:<8} {qoc:<12.1f} {loc:<8} {sloc:<8} {percentage:<10.1f}%")
         print("=" * 80)
 
 
@@ -108,6 +282,67 @@ def print_success(message: str):
     print(f"✅ {message}")
 
 
+# Analyzer shared by every command run in this process
+_ANALYZER_SINGLETON = None
+
+# Languages whose parser failure has been reported, so each is warned about
+# once per process
+_warned_languages = set()
+
+
+def warn_language_error(lang: str, error: str):
+    """Report a grammar that failed to load for a file the command needs"""
+    if lang not in _warned_languages:
+        _warned_languages.add(lang)
+        print_warning(f"Cannot initialize {lang} parser: {error}")
+
+
+def get_analyzer(args) -> 'QOCAnalyzer':
+    """Return the process-wide analyzer, using the persistent result cache
+    unless --no-cache is given
+    
+    Grammar and parser setup happens once; repeated calls (e.g. when main()
+    is driven as a library) reuse it as long as the cache settings match.
+    Grammars are only loaded for the languages a command meets, and a
+    failing one is reported when it is first needed.
+    """
+    global _ANALYZER_SINGLETON
+    from .analyzer import QOCAnalyzer
+    from .cache import default_cache_path
+    
+    cache_path = None if getattr(args, 'no_cache', False) else str(default_cache_path())
+    refresh_cache = getattr(args, 'force_full_analysis', False)
+    if (_ANALYZER_SINGLETON is None
+            or _ANALYZER_SINGLETON._cache_path != cache_path
+            or _ANALYZER_SINGLETON.refresh_cache != refresh_cache):
+        _ANALYZER_SINGLETON = QOCAnalyzer(cache_path=cache_path, refresh_cache=refresh_cache,
+                                          on_language_error=warn_language_error)
+    
+    return _ANALYZER_SINGLETON
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value!r}")
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    """argparse type for counts where 0 means no limit"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative integer: {value!r}")
+    return number
+
+
 def create_parser():
     """Create command line argument parser"""
     parser = argparse.ArgumentParser(
@@ -159,6 +394,13 @@ Examples:
         action='store_true',
         help='Show detailed AST node statistics'
     )
+    analyze_parser.add_argument(
+        '--top',
+        type=non_negative_int,
+        default=50,
+        metavar='N',
+        help='Show at most N node types in detailed output, 0 for all (default: 50)'
+    )
     analyze_parser.add_argument(
         '-o', '--output',
         help='Output results to file'
@@ -169,6 +411,23 @@ Examples:
         default='console',
         help='Output format (default: console)'
     )
+    analyze_parser.add_argument(
+        '-j', '--jobs',
+        type=positive_int,
+        metavar='N',
+        help='Number of worker processes for directory analysis (default: CPU count)'
+    )
+    analyze_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the persistent result cache'
+    )
+    analyze_parser.add_argument(
+        '--force-full-analysis',
+        action='store_true',
+        help='Re-analyze every file instead of reusing cached results (the cache is still updated)'
+    )
+    analyze_parser.set_defaults(func=analyze_command)
     
     # Compare command
     compare_parser = subparsers.add_parser(
@@ -184,6 +443,12 @@ Examples:
         'file2',
         help='Second file to compare'
     )
+    compare_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the persistent result cache'
+    )
+    compare_parser.set_defaults(func=compare_command)
     
     # Demo command
     demo_parser = subparsers.add_parser(
@@ -191,106 +456,90 @@ Examples:
         help='Demonstrate QOC functionality',
         description='Analyze code files to showcase QOC tool capabilities'
     )
+    demo_parser.add_argument(
+        '-j', '--jobs',
+        type=positive_int,
+        metavar='N',
+        help='Number of worker processes for directory analysis (default: CPU count)'
+    )
+    demo_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the persistent result cache'
+    )
+    demo_parser.set_defaults(func=demo_command)
     
     return parser
 
 
 def analyze_command(args):
     """Handle analyze command"""
-    # Check if path exists
-    if not os.path.exists(args.path):
+    # One stat tells both whether the path exists and whether it is a file
+    try:
+        path_mode = os.stat(args.path).st_mode
+    except FileNotFoundError:
         print_error(f"Path does not exist: {args.path}")
         return 1
+    except OSError as e:
+        print_error(f"Cannot access {args.path}: {e}")
+        return 1
     
     try:
-        analyzer = QOCAnalyzer()
-        
-        # Show warnings for failed language parsers
-        failed_languages = analyzer.get_failed_languages()
-        for lang, error in failed_languages:
-            print_warning(f"Cannot initialize {lang} parser: {error}")
+        analyzer = get_analyzer(args)
         
-        if os.path.isfile(args.path):
+        if stat.S_ISREG(path_mode):
             # Analyze single file
-            result = analyzer.analyze_file(args.path)
-            results = [result]
+            results = iter([analyzer.analyze_file(args.path)])
         else:
-            # Analyze directory
-            results = analyzer.analyze_directory(args.path, args.recursive)
-            if not results:
-                print_warning("No supported files found")
-                return 1
+            # Analyze directory; results are streamed to the output as they arrive
+            results = analyzer.analyze_directory_iter(args.path, args.recursive, args.jobs)
+        
+        # Look at the first two results to tell "none" and "just one" apart
+        head = list(islice(results, 2))
+        if not head:
+            print_warning("No supported files found")
+            return 1
+        results = chain(head, results)
         
         if args.format == 'console':
-            if len(results) == 1:
-                print_result(results[0], args.detailed)
+            if len(head) == 1:
+                print_result(head[0], args.detailed, args.top)
+            elif args.detailed:
+                # The per-file tables come after the summary, so keep the results
+                results = list(results)
+                print_summary(results)
+                print("\n🔍 Detailed Results:")
+                for result in results:
+                    print(f"\n{'='*60}")
+                    print_result(result, args.detailed, args.top)
             else:
                 print_summary(results)
-                if args.detailed:
-                    print("\n🔍 Detailed Results:")
-                    for result in results:
-                        print(f"\n{'='*60}")
-                        print_result(result, args.detailed)
         
         elif args.format == 'json':
-            output_data = {
-                'summary': {
-                    'total_files': len(results),
-                    'total_qoc': sum(r.total_qoc for r in results),
-                    'total_loc': sum(r.loc for r in results),  # Lines of Code (including empty lines)
-                    'total_sloc': sum(r.sloc for r in results),  # Source Lines of Code (excluding empty lines)
-                    'total_nodes': sum(r.ast_nodes for r in results)
-                },
-                'files': []
-            }
-            
-            for result in results:
-                file_data = {
-                    'filepath': result.filepath,
-                    'language': result.language,
-                    'qoc': result.total_qoc,
-                    'loc': result.loc,  # Lines of Code
-                    'sloc': result.sloc,  # Source Lines of Code
-                    'ast_nodes': result.ast_nodes
-                }
-                
-                if args.detailed and result.node_stats:
-                    file_data['node_stats'] = {}
-                    for node_type, node_info in result.node_stats.items():
-                        file_data['node_stats'][node_type] = {
-                            'count': node_info.count,
-                            'weight': node_info.weight,
-                            'total_weight': node_info.total_weight
-                        }
-                
-                output_data['files'].append(file_data)
-            
-            json_output = json.dumps(output_data, indent=2, ensure_ascii=False)
-            
             if args.output:
-                with open(args.output, 'w', encoding='utf-8') as f:
-                    f.write(json_output)
+                with open(args.output, 'wb') as f:
+                    write_json_report(f, results, args.detailed)
                 print_success(f"Results saved to: {args.output}")
             else:
-                print(json_output)
+                # Already UTF-8 encoded; skip the decode/re-encode round trip
+                stdout_buffer = getattr(sys.stdout, 'buffer', None)
+                if stdout_buffer is not None:
+                    sys.stdout.flush()
+                    write_json_report(stdout_buffer, results, args.detailed)
+                    stdout_buffer.write(b'\n')
+                    stdout_buffer.flush()
+                else:
+                    # stdout was replaced by a text-only stream
+                    report = io.BytesIO()
+                    write_json_report(report, results, args.detailed)
+                    print(report.getvalue().decode('utf-8'))
         
         elif args.format == 'csv':
             if args.output:
-                with open(args.output, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['Filename', 'Language', 'QOC', 'AST Nodes', 'LOC', 'SLOC', 'QOC/SLOC Ratio'])
-                    
-                    for result in results:
-                        ratio = result.total_qoc / result.sloc if result.sloc > 0 else 0
-                        writer.writerow([
-                            result.filepath,
-                            result.language,
-                            f"{result.total_qoc:.1f}",
-                            result.ast_nodes,
-                            result.loc,
-                            result.sloc,
-                            f"{ratio:.2f}"
-                        ])
+                # A large buffer turns the per-row writes into a few big ones
+                with open(args.output, 'w', newline='', encoding='utf-8',
+                          buffering=CSV_BUFFER_SIZE) as csvfile:
+                    csvfile.writelines(csv_report_lines(results))
                 print_success(f"CSV results saved to: {args.output}")
             else:
                 print_error("CSV format requires output file (-o)")
@@ -309,24 +558,28 @@ def analyze_command(args):
         return 1
 
 
+# Comparison table, formatted in one go with both files' metrics
+COMPARE_TEMPLATE = "\n".join([
+    "\n📊 File Comparison Results",
+    "=" * 60,
+    f"{'Metric':<25} {'File 1':<15} {'File 2':<15} {'Difference':<15}",
+    "=" * 60,
+    f"{'File Path':<25} {{path1:<15}} {{path2:<15}} {'-':<15}",
+    f"{'QOC':<25} {{qoc1:<15.1f}} {{qoc2:<15.1f}} {{qoc_diff:<+15.1f}}",
+    f"{'LOC':<25} {{loc1:<15}} {{loc2:<15}} {{loc_diff:<+15}}",
+    f"{'SLOC':<25} {{sloc1:<15}} {{sloc2:<15}} {{sloc_diff:<+15}}",
+    f"{'AST Nodes':<25} {{nodes1:<15}} {{nodes2:<15}} {{nodes_diff:<+15}}",
+    f"{'Efficiency Ratio':<25} {{ratio1:<15.2f}} {{ratio2:<15.2f}} {{ratio_diff:<+15.2f}}",
+    "=" * 60,
+    "\n🔍 Analysis Conclusion:",
+])
+
+
 def compare_command(args):
     """Handle compare command"""
-    # Check if files exist
-    if not os.path.exists(args.file1):
-        print_error(f"File does not exist: {args.file1}")
-        return 1
-    
-    if not os.path.exists(args.file2):
-        print_error(f"File does not exist: {args.file2}")
-        return 1
-    
+    # A missing file surfaces as FileNotFoundError from the analyzer
     try:
-        analyzer = QOCAnalyzer()
-        
-        # Show warnings for failed language parsers
-        failed_languages = analyzer.get_failed_languages()
-        for lang, error in failed_languages:
-            print_warning(f"Cannot initialize {lang} parser: {error}")
+        analyzer = get_analyzer(args)
         
         result1 = analyzer.analyze_file(args.file1)
         result2 = analyzer.analyze_file(args.file2)
@@ -337,28 +590,22 @@ def compare_command(args):
         loc_diff = result2.loc - result1.loc
         nodes_diff = result2.ast_nodes - result1.ast_nodes
         
-        # Display comparison results
-        print("\n📊 File Comparison Results")
-        print("=" * 60)
-        print(f"{'Metric':<25} {'File 1':<15} {'File 2':<15} {'Difference':<15}")
-        print("=" * 60)
-        print(f"{'File Path':<25} {str(result1.filepath):<15} {str(result2.filepath):<15} {'-':<15}")
-        print(f"{'QOC':<25} {result1.total_qoc:<15.1f} {result2.total_qoc:<15.1f} {qoc_diff:<+15.1f}")
-        print(f"{'LOC':<25} {result1.loc:<15} {result2.loc:<15} {loc_diff:<+15}")
-        print(f"{'SLOC':<25} {result1.sloc:<15} {result2.sloc:<15} {sloc_diff:<+15}")
-        print(f"{'AST Nodes':<25} {result1.ast_nodes:<15} {result2.ast_nodes:<15} {nodes_diff:<+15}")
-        
         # Calculate efficiency ratios
         ratio1 = result1.total_qoc / result1.sloc if result1.sloc > 0 else 0
         ratio2 = result2.total_qoc / result2.sloc if result2.sloc > 0 else 0
         ratio_diff = ratio2 - ratio1
         
-        print(f"{'Efficiency Ratio':<25} {ratio1:<15.2f} {ratio2:<15.2f} {ratio_diff:<+15.2f}")
-        print("=" * 60)
+        # Display comparison results
+        print(COMPARE_TEMPLATE.format(
+            path1=str(result1.filepath), path2=str(result2.filepath),
+            qoc1=result1.total_qoc, qoc2=result2.total_qoc, qoc_diff=qoc_diff,
+            loc1=result1.loc, loc2=result2.loc, loc_diff=loc_diff,
+            sloc1=result1.sloc, sloc2=result2.sloc, sloc_diff=sloc_diff,
+            nodes1=result1.ast_nodes, nodes2=result2.ast_nodes, nodes_diff=nodes_diff,
+            ratio1=ratio1, ratio2=ratio2, ratio_diff=ratio_diff
+        ))
         
         # Analysis conclusion
-        print("\n🔍 Analysis Conclusion:")
-        
         if qoc_diff > 0:
             conclusion = f"File 2's code complexity increased by {qoc_diff:.1f} QOC"
         elif qoc_diff < 0:
@@ -380,18 +627,17 @@ def compare_command(args):
         return 1
 
 
+# Longest file path shown in full in the demo table
+DEMO_PATH_WIDTH = 34
+
+
 def demo_command(args):
     """Handle demo command"""
     print("🚀 QOC Demo\n")
     print("Demonstrating QOC analysis capabilities...\n")
     
     try:
-        analyzer = QOCAnalyzer()
-        
-        # Show warnings for failed language parsers
-        failed_languages = analyzer.get_failed_languages()
-        for lang, error in failed_languages:
-            print_warning(f"Cannot initialize {lang} parser: {error}")
+        analyzer = get_analyzer(args)
         
         # Check if src directory exists
         src_path = "src"
@@ -400,7 +646,7 @@ def demo_command(args):
             src_path = "."
         
         print(f"📁 Analyzing {src_path} directory...")
-        results = analyzer.analyze_directory(src_path, recursive=True)
+        results = analyzer.analyze_directory(src_path, recursive=True, jobs=args.jobs)
         
         if not results:
             print_warning("No supported files found.")
@@ -414,15 +660,16 @@ def demo_command(args):
         print(f"{'File':<30} {'Lang':<10} {'QOC':<8} {'LOC':<6} {'SLOC':<6} {'AST':<6} {'Ratio':<6}")
         print("=" * 80)
         
-        for result in results:
-            # Truncate long file paths for better display
-            filepath = result.filepath
-            if len(filepath) > 34:
-                filepath = "..." + filepath[-31:]
-            
-            ratio = result.total_qoc / result.sloc if result.sloc > 0 else 0
-            
-            print(f"{filepath:<30} {result.language:<10} {result.total_qoc:<8.1f} {result.loc:<6} {result.sloc:<6} {result.ast_nodes:<6} {ratio:<6.2f}")
+        print("\n".join([
+            "%-30s %-10s %-8.1f %-6d %-6d %-6d %-6.2f" % (
+                # Truncate long file paths for better display
+                filepath if len(filepath := result.filepath) <= DEMO_PATH_WIDTH
+                else "..." + filepath[3 - DEMO_PATH_WIDTH:],
+                result.language, result.total_qoc, result.loc, result.sloc, result.ast_nodes,
+                result.total_qoc / result.sloc if result.sloc > 0 else 0
+            )
+            for result in results
+        ]))
         
         print("=" * 80)
         print()
@@ -452,18 +699,28 @@ def load_config():
     """Load configuration file"""
     config_path = Path(__file__).parent.parent.parent / "config.json"
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        from .analyzer import read_config
+        return read_config(config_path)
     except FileNotFoundError:
         print_error(f"Configuration file not found: {config_path}")
         return None
-    except json.JSONDecodeError as e:
+    except ValueError as e:
+        # json.JSONDecodeError (and orjson's subclass of it) is a ValueError
         print_error(f"Invalid JSON in configuration file: {e}")
         return None
 
 
 def main():
     """Main entry point"""
+    # Output is written in blocks, so a terminal doesn't need a flush per line
+    if sys.stdout.isatty():
+        try:
+            sys.stdout.reconfigure(line_buffering=False)
+            atexit.register(sys.stdout.flush)
+        except AttributeError:
+            # stdout was replaced by a stream without reconfigure()
+            pass
+    
     parser = create_parser()
     
     # If no arguments provided, show help
@@ -473,17 +730,19 @@ def main():
     
     args = parser.parse_args()
     
-    # Execute the appropriate command
+    # Execute the appropriate command, writing its report in one go
     try:
-        if args.command == 'analyze':
-            return analyze_command(args)
-        elif args.command == 'compare':
-            return compare_command(args)
-        elif args.command == 'demo':
-            return demo_command(args)
-        else:
+        if not hasattr(args, 'func'):
             parser.print_help()
             return 1
+        
+        # A JSON report on stdout is streamed as it is written, so it is
+        # never held in memory as a whole
+        if getattr(args, 'format', None) == 'json' and not args.output:
+            return args.func(args)
+        
+        with buffered_output():
+            return args.func(args)
     except KeyboardInterrupt:
         print("\n⚠️  Operation interrupted by user")
         return 1
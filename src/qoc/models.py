@@ -5,22 +5,29 @@ QOC Data Models
 Defines the data structures for QOC analysis results
 """
 
+import sys
 from dataclasses import dataclass
 from typing import Dict, Any, Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NodeInfo:
     """AST Node Information"""
     node_type: str
     weight: float
     count: int = 0
     
-    def __post_init__(self):
-        self.total_weight = self.weight * self.count
+    @property
+    def total_weight(self) -> float:
+        """Weight contributed by all nodes of this type"""
+        return self.weight * self.count
+    
+    def __reduce__(self):
+        # Unpickled copies (cache hits, worker results) intern their names again
+        return _make_node_info, (self.node_type, self.weight, self.count)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class QOCResult:
     """QOC analysis result"""
     filepath: str
@@ -29,4 +36,28 @@ class QOCResult:
     ast_nodes: int
     sloc: int  # Source Lines of Code (excluding empty lines and comments)
     loc: int = 0  # Lines of Code (including empty lines and comments)
-    node_stats: Optional[Dict[str, NodeInfo]] = None 
\ No newline at end of file
+    node_stats: Optional[Dict[str, NodeInfo]] = None 
+    
+    def __reduce__(self):
+        # Unpickled copies intern language and node type names again
+        return _make_qoc_result, (self.filepath, self.language, self.total_qoc, self.ast_nodes,
+                                  self.sloc, self.loc, self.node_stats)
+
+
+# Unpickling reconstructors: the analyzer already builds results from interned
+# names, but unpickled copies carry fresh strings. Interning them again lets
+# every result in a process share one copy of each name
+
+def _make_node_info(node_type: str, weight: float, count: int) -> NodeInfo:
+    """Rebuild an unpickled NodeInfo with an interned type name"""
+    return NodeInfo(sys.intern(node_type), weight, count)
+
+
+def _make_qoc_result(filepath: str, language: str, total_qoc: float, ast_nodes: int,
+                     sloc: int, loc: int, node_stats: Optional[Dict[str, NodeInfo]]) -> QOCResult:
+    """Rebuild an unpickled QOCResult with interned language and node type names"""
+    if node_stats:
+        node_stats = {sys.intern(node_type): node_info
+                      for node_type, node_info in node_stats.items()}
+    return QOCResult(filepath, sys.intern(language), total_qoc, ast_nodes,
+                     sloc, loc, node_stats)